@@ -3,7 +3,7 @@ import asyncio
 from trading.config import AppConfig
 from trading.engine import AsyncTradingEngine
 from trading.strategy import TrendFollowingStrategy
-from trading.utils import setup_logging
+from trading.utils import setup_logging, stop_logging
 from trading.broker import PaperBrokerClient
 from trading.risk import RiskManager
 from trading.execution import OrderHandler
@@ -18,7 +18,10 @@ async def main() -> None:
     broker = PaperBrokerClient(config)
     risk_manager = RiskManager(config)
     order_handler = OrderHandler(broker=broker, risk_manager=risk_manager, config=config)
-    strategy = TrendFollowingStrategy()
+    if len(config.symbols) == 1:
+        strategy = TrendFollowingStrategy.for_symbol(config.symbols[0])
+    else:
+        strategy = TrendFollowingStrategy()
 
     engine = AsyncTradingEngine(
         broker=broker,
@@ -30,7 +33,10 @@ async def main() -> None:
     )
 
     # Demonstration runtime is bounded to avoid runaway processes in this example.
-    await engine.run(runtime_seconds=30)
+    try:
+        await engine.run(runtime_seconds=30)
+    finally:
+        stop_logging()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,144 @@
+import numpy as np
+import pytest
+
+from trading.broker import PriceTick
+from trading.strategy import Signal, TrendFollowingStrategy
+
+
+def _bars(seed: int, n: int = 60) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    close = 2000 + np.cumsum(rng.normal(0, 1, n))
+    return close, close + 1, close - 1
+
+
+def test_warmup_grows_state_past_initial_capacity():
+    symbols = [f"SYM{k}" for k in range(5)]
+    grown = TrendFollowingStrategy(initial_capacity=1)
+    roomy = TrendFollowingStrategy(initial_capacity=len(symbols))
+    for k, symbol in enumerate(symbols):
+        grown.warmup(symbol, *_bars(k))
+        roomy.warmup(symbol, *_bars(k))
+
+    assert grown.state.shape[0] >= len(symbols)
+    for symbol in symbols:
+        assert grown.get_state(symbol) == roomy.get_state(symbol)
+
+
+def test_set_state_grows_state_past_initial_capacity():
+    source = TrendFollowingStrategy()
+    source.warmup("XAUUSD", *_bars(0))
+    snapshot = source.get_state("XAUUSD")
+
+    strategy = TrendFollowingStrategy(initial_capacity=1)
+    strategy.set_state("A", snapshot)
+    strategy.set_state("B", snapshot)
+
+    assert strategy.get_state("A") == snapshot
+    assert strategy.get_state("B") == snapshot
+
+
+def test_warmup_rejects_mismatched_bar_lengths():
+    close, high, low = _bars(0)
+    strategy = TrendFollowingStrategy()
+    with pytest.raises(ValueError):
+        strategy.warmup("XAUUSD", close, high[:-1], low)
+    with pytest.raises(ValueError):
+        strategy.warmup("XAUUSD", close, high, low[:-1])
+    assert "XAUUSD" not in strategy.symbol_idx
+
+
+def _random_walk(seed: int = 7, n: int = 1500) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    close = 2000 + np.cumsum(rng.normal(0, 1, n))
+    close[200:230] = close[200]  # flat stretch: exercises avg_loss == 0
+    return close, close + rng.uniform(0, 2, n), close - rng.uniform(0, 2, n)
+
+
+def _reference(close, high, low, fast=9, slow=21, rsi_period=14, atr_period=14, atr_multiplier=2.0):
+    """The original per-tick algorithm in plain Python: signal codes and stops (NaN on HOLD)."""
+    codes = np.zeros(len(close), dtype=np.int8)
+    stops = np.full(len(close), np.nan)
+    fast_ema = slow_ema = atr = prev_close = avg_gain = avg_loss = None
+    seed: list[float] = []
+    for i, (c, h, lo) in enumerate(zip(close.tolist(), high.tolist(), low.tolist())):
+        prev_fast, prev_slow = fast_ema, slow_ema
+        fast_ema = c if prev_fast is None else c * (2 / (fast + 1)) + prev_fast * (1 - 2 / (fast + 1))
+        slow_ema = c if prev_slow is None else c * (2 / (slow + 1)) + prev_slow * (1 - 2 / (slow + 1))
+        tr = h - lo if prev_close is None else max(h - lo, abs(h - prev_close), abs(lo - prev_close))
+        atr = tr if atr is None else (atr * (atr_period - 1) + tr) / atr_period
+
+        rsi = None
+        if prev_close is not None:
+            delta = c - prev_close
+            if avg_gain is None:
+                seed.append(delta)
+                if len(seed) == rsi_period:
+                    avg_gain = sum(max(x, 0.0) for x in seed) / rsi_period
+                    avg_loss = sum(max(-x, 0.0) for x in seed) / rsi_period
+            else:
+                avg_gain = (avg_gain * (rsi_period - 1) + max(delta, 0.0)) / rsi_period
+                avg_loss = (avg_loss * (rsi_period - 1) + max(-delta, 0.0)) / rsi_period
+            if avg_gain is not None:
+                rsi = 100.0 if avg_loss == 0 else 100 - 100 / (1 + avg_gain / avg_loss)
+        prev_close = c
+
+        if prev_fast is None or rsi is None:
+            continue
+        if prev_fast <= prev_slow and fast_ema > slow_ema and rsi < 70:
+            codes[i], stops[i] = Signal.BUY, c - atr_multiplier * atr
+        elif prev_fast >= prev_slow and fast_ema < slow_ema and rsi > 30:
+            codes[i], stops[i] = Signal.SELL, c + atr_multiplier * atr
+    return codes, stops
+
+
+def _ticks(symbol, close, high, low) -> list[PriceTick]:
+    return [
+        PriceTick(symbol, c - 0.1, c + 0.1, 0.0, 0.2, 0.0, None, h, lo, c)
+        for c, h, lo in zip(close.tolist(), high.tolist(), low.tolist())
+    ]
+
+
+def _decisions_to_arrays(decisions) -> tuple[np.ndarray, np.ndarray]:
+    codes = np.array([int(d.signal) for d in decisions], dtype=np.int8)
+    stops = np.array([np.nan if d.stop_loss is None else d.stop_loss for d in decisions])
+    return codes, stops
+
+
+def test_all_paths_match_reference_signals():
+    close, high, low = _random_walk()
+    expected_codes, expected_stops = _reference(close, high, low)
+    assert (expected_codes == Signal.BUY).any() and (expected_codes == Signal.SELL).any()
+
+    def check(codes, stops):
+        np.testing.assert_array_equal(codes, expected_codes)
+        np.testing.assert_allclose(stops, expected_stops, rtol=1e-9, equal_nan=True)
+
+    ticks = _ticks("XAUUSD", close, high, low)
+
+    check(*TrendFollowingStrategy().process_batch(close, high, low))
+
+    multi = TrendFollowingStrategy(initial_capacity=1)
+    check(*_decisions_to_arrays([multi.get_signal(tick) for tick in ticks]))
+
+    single = TrendFollowingStrategy.for_symbol("XAUUSD")
+    check(*_decisions_to_arrays([single.get_signal(tick) for tick in ticks]))
+
+    # Interleave a reversed second symbol so each bulk batch spans several state rows, starting from capacity 1.
+    rev_close, rev_high, rev_low = close[::-1].copy(), high[::-1].copy(), low[::-1].copy()
+    rev_codes, rev_stops = _reference(rev_close, rev_high, rev_low)
+    other = _ticks("XAGUSD", rev_close, rev_high, rev_low)
+    interleaved = [tick for pair in zip(ticks, other) for tick in pair]
+    expected = {"XAUUSD": (expected_codes, expected_stops), "XAGUSD": (rev_codes, rev_stops)}
+    bulk = TrendFollowingStrategy(initial_capacity=1)
+    batch_size = 37
+    for start in range(0, len(interleaved), batch_size):
+        hits = bulk.process_bulk_ticks(interleaved[start : start + batch_size])
+        want = []
+        for j in range(start, min(start + batch_size, len(interleaved))):
+            symbol = interleaved[j].symbol
+            codes, stops = expected[symbol]
+            if codes[j // 2] != Signal.HOLD:
+                want.append((symbol, codes[j // 2], stops[j // 2]))
+        assert [(symbol, int(d.signal)) for symbol, d in hits] == [(symbol, code) for symbol, code, _ in want]
+        for (_, decision), (_, _, stop) in zip(hits, want):
+            assert decision.stop_loss == pytest.approx(stop, rel=1e-9)
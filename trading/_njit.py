@@ -0,0 +1,18 @@
+"""Optional numba JIT: kernels compile when numba is installed and run as plain Python otherwise."""
+from __future__ import annotations
+
+try:
+    from numba import njit
+except ImportError:  # numba is an optional speed-up, never a requirement.
+
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+
+        def decorator(func):
+            return func
+
+        return decorator
+
+
+__all__ = ["njit"]
@@ -2,16 +2,21 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import math
 import time
 from dataclasses import dataclass
-from typing import AsyncIterator
+from enum import IntEnum
+from typing import Any, AsyncIterator
+from urllib.parse import quote
 
-import yfinance as yf
+import httpx
 
 from .config import AppConfig
 
 logger = logging.getLogger("broker")
 
+YAHOO_CHART_URL = "https://query1.finance.yahoo.com/v8/finance/chart/{ticker}"
+
 
 @dataclass
 class PriceTick:
@@ -26,11 +31,34 @@ class PriceTick:
     low: float | None = None
     close: float | None = None
 
+    def __post_init__(self) -> None:
+        # Fill the bar fields once at construction so consumers can read close/high/low unchecked.
+        if self.close is None:
+            self.close = (self.bid + self.ask) / 2
+        if self.high is None:
+            self.high = self.close
+        if self.low is None:
+            self.low = self.close
+
+
+class Side(IntEnum):
+    """Order direction; the value doubles as the signed multiplier for size and price offsets."""
+
+    BUY = 1
+    SELL = -1
+
+
+@dataclass(slots=True)
+class Position:
+    size: float
+    entry: float
+    pnl: float = 0.0
+
 
 @dataclass
 class OrderRequest:
     symbol: str
-    side: str  # BUY or SELL
+    side: Side
     size: float
     price: float
     stop_loss: float
@@ -49,9 +77,27 @@ class OrderResult:
     order_id: str | None = None
 
 
+def _last_bar(payload: dict[str, Any]) -> tuple[float, float, float, float]:
+    """Return the most recent complete OHLC bar from a Yahoo chart response."""
+    results = (payload.get("chart") or {}).get("result") or []
+    if not results:
+        raise RuntimeError("Empty chart result")
+    quotes = results[0].get("indicators", {}).get("quote") or [{}]
+    quote_ = quotes[0]
+    opens = quote_.get("open") or []
+    highs = quote_.get("high") or []
+    lows = quote_.get("low") or []
+    closes = quote_.get("close") or []
+    # The in-progress bar can carry nulls; walk back to the last populated one.
+    for i in range(len(closes) - 1, -1, -1):
+        if None not in (opens[i], highs[i], lows[i], closes[i]):
+            return float(opens[i]), float(highs[i]), float(lows[i]), float(closes[i])
+    raise RuntimeError("No populated bars in chart result")
+
+
 class PaperBrokerClient:
     """
-    Paper-trading broker: pulls real prices via yfinance and simulates fills, margin, and PnL.
+    Paper-trading broker: pulls real prices from Yahoo Finance and simulates fills, margin, and PnL.
     """
 
     def __init__(self, config: AppConfig) -> None:
@@ -60,141 +106,214 @@ class PaperBrokerClient:
         self.balance = config.initial_balance
         self.equity = config.initial_balance
         self.margin_used = 0.0
-        self.positions: dict[str, dict[str, float]] = {}
+        self.positions: dict[str, Position] = {}
         self._last_prices: dict[str, float] = {}
+        # Sum of abs(size * mid) over positions, each at its own symbol's price; refreshed by every mark
+        # so exposure checks need not re-scan positions.
+        self._aggregate_notional = 0.0
+        self._account = self._snapshot()
         self._latency_ms = 25
-        self._ticker = yf.Ticker(self.config.data_symbol)
+        self._symbols = list(config.symbols)
+        self._price_cache: dict[str, tuple[float, tuple[float, float, float, float]]] = {}
+        # One keep-alive client for every poll so TCP/TLS setup is paid once, not per request.
+        self._client: httpx.AsyncClient | None = None
+        # Caps in-flight HTTP requests across all concurrent per-symbol streams.
+        self._rpc_sem = asyncio.Semaphore(8)
 
     async def connect(self) -> None:
         # Validate data source availability with a quick fetch.
-        await asyncio.to_thread(self._fetch_price_sync)
+        await self._fetch_price_cached(self._symbols)
         self.connected = True
-        logger.info("Connected to paper broker with data feed %s", self.config.data_symbol)
+        logger.info(
+            "Connected to paper broker with data feed %s",
+            ", ".join(self._data_ticker(symbol) for symbol in self._symbols),
+        )
 
     async def close(self) -> None:
         self.connected = False
+        if self._client is not None:
+            await self._client.aclose()
         logger.info("Paper broker connection closed")
 
-    def _fetch_price_sync(self) -> tuple[float, float, float, float]:
-        data = self._ticker.history(period="1d", interval="1m")
-        if data.empty:
-            raise RuntimeError("Empty price history from yfinance")
-        last = data.tail(1)
-        open_ = float(last["Open"].iloc[0])
-        high = float(last["High"].iloc[0])
-        low = float(last["Low"].iloc[0])
-        close = float(last["Close"].iloc[0])
-        return open_, high, low, close
-
-    def _mark_positions(self, mid_price: float) -> None:
+    def _data_ticker(self, symbol: str) -> str:
+        return self.config.data_symbols.get(symbol, self.config.data_symbol)
+
+    def _http_client(self) -> httpx.AsyncClient:
+        # A closed client cannot be reused, so reconnects after close() get a fresh one.
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                headers={"User-Agent": "Mozilla/5.0"},
+                limits=httpx.Limits(max_connections=8, max_keepalive_connections=4),
+                timeout=5.0,
+            )
+        return self._client
+
+    async def _fetch_bar(self, ticker: str) -> tuple[float, float, float, float]:
+        async with self._rpc_sem:
+            response = await self._http_client().get(
+                YAHOO_CHART_URL.format(ticker=quote(ticker, safe="")),
+                params={"range": "1d", "interval": "1m"},
+            )
+        response.raise_for_status()
+        return _last_bar(response.json())
+
+    async def _fetch_price_async(self, symbols: list[str]) -> dict[str, tuple[float, float, float, float]]:
+        """Fetch the latest 1m OHLC bar for every symbol concurrently from the Yahoo chart endpoint."""
+        tickers = [self._data_ticker(symbol) for symbol in symbols]
+        results = await asyncio.gather(*(self._fetch_bar(ticker) for ticker in tickers), return_exceptions=True)
+        prices: dict[str, tuple[float, float, float, float]] = {}
+        for symbol, ticker, result in zip(symbols, tickers, results):
+            if isinstance(result, BaseException):
+                logger.warning("No price history for %s (%s): %s", symbol, ticker, result)
+                continue
+            prices[symbol] = result
+        if not prices:
+            raise RuntimeError("Empty price history from Yahoo Finance")
+        return prices
+
+    async def _fetch_price_cached(self, symbols: list[str]) -> dict[str, tuple[float, float, float, float]]:
+        """Serve OHLC fetched within the last half poll interval from cache, fetching only stale symbols."""
+        ttl = self.config.data_poll_interval / 2
+        now = time.monotonic()
+        prices: dict[str, tuple[float, float, float, float]] = {}
+        stale: list[str] = []
+        for symbol in symbols:
+            cached = self._price_cache.get(symbol)
+            if cached is not None and now - cached[0] < ttl:
+                prices[symbol] = cached[1]
+            else:
+                stale.append(symbol)
+        if stale:
+            fetched = await self._fetch_price_async(stale)
+            fetched_at = time.monotonic()
+            for symbol, ohlc in fetched.items():
+                self._price_cache[symbol] = (fetched_at, ohlc)
+            prices.update(fetched)
+        return prices
+
+    def _mark_positions(self) -> None:
+        """Mark every position at its own symbol's latest mid."""
+        # Locals keep attribute lookups out of the per-position loop.
+        positions = self.positions
+        prices = self._last_prices
         unrealized = 0.0
-        margin = 0.0
-        for symbol, position in list(self.positions.items()):
-            position["pnl"] = (mid_price - position["entry"]) * position["size"]
-            unrealized += position["pnl"]
-            margin += abs(position["size"] * mid_price) / self.config.leverage_limit
-            self.positions[symbol] = position
-        self.margin_used = margin
+        notional = 0.0
+        for symbol, position in positions.items():
+            size = position.size
+            mid = prices[symbol]
+            pnl = (mid - position.entry) * size
+            position.pnl = pnl
+            unrealized += pnl
+            notional += abs(size * mid)
+        self._aggregate_notional = notional
+        self.margin_used = notional / self.config.leverage_limit
         self.equity = self.balance + unrealized
 
+    def _snapshot(self) -> dict[str, float]:
+        return {
+            "balance": self.balance,
+            "equity": self.equity,
+            "margin_used": self.margin_used,
+            "unrealized": self.equity - self.balance,
+            "aggregate_notional": self._aggregate_notional,
+        }
+
+    def _mark_and_snapshot(self) -> dict[str, float]:
+        """Mark positions once and cache the resulting account metrics for get_account_info."""
+        self._mark_positions()
+        self._account = self._snapshot()
+        return self._account
+
     async def price_stream(self, symbols: list[str]) -> AsyncIterator[PriceTick]:
-        """Yield prices from yfinance at a fixed polling interval."""
-        symbol = symbols[0] if symbols else self.config.data_symbol
+        """Yield prices from Yahoo Finance at a fixed polling interval, one tick per symbol per poll."""
+        symbols = symbols or self._symbols
         while self.connected:
             try:
-                open_, high, low, close = await asyncio.to_thread(self._fetch_price_sync)
-                mid = close
-                last_mid = self._last_prices.get(symbol, mid)
-                spread = self.config.simulated_spread
-                bid = mid - spread / 2
-                ask = mid + spread / 2
-                volatility = abs(mid - last_mid) / last_mid if last_mid else 0.0
-                self._last_prices[symbol] = mid
-                self._mark_positions(mid)
-                yield PriceTick(
-                    symbol=symbol,
-                    bid=bid,
-                    ask=ask,
-                    timestamp=time.time(),
-                    spread=spread,
-                    volatility=volatility,
-                    open=open_,
-                    high=high,
-                    low=low,
-                    close=close,
-                )
+                prices = await self._fetch_price_cached(symbols)
+                for symbol, (open_, high, low, close) in prices.items():
+                    mid = close
+                    last_mid = self._last_prices.get(symbol, mid)
+                    spread = self.config.simulated_spread
+                    bid = mid - spread / 2
+                    ask = mid + spread / 2
+                    volatility = abs(mid - last_mid) / last_mid if last_mid else 0.0
+                    self._last_prices[symbol] = mid
+                    self._mark_and_snapshot()
+                    yield PriceTick(
+                        symbol=symbol,
+                        bid=bid,
+                        ask=ask,
+                        timestamp=time.time(),
+                        spread=spread,
+                        volatility=volatility,
+                        open=open_,
+                        high=high,
+                        low=low,
+                        close=close,
+                    )
             except Exception as exc:
                 logger.error("Price fetch failed: %s", exc)
             await asyncio.sleep(self.config.data_poll_interval)
 
     async def get_account_info(self) -> dict[str, float]:
         """Return account metrics for risk checks."""
-        # Ensure equity reflects latest marks.
-        last_mid = next(iter(self._last_prices.values()), None)
-        if last_mid is not None:
-            self._mark_positions(last_mid)
-        unrealized = sum(pos["pnl"] for pos in self.positions.values())
-        self.equity = self.balance + unrealized
-        return {
-            "balance": self.balance,
-            "equity": self.equity,
-            "margin_used": self.margin_used,
-            "unrealized": unrealized,
-        }
+        # Every write to _last_prices (price stream and fills) re-marks and re-snapshots right away,
+        # so the cached snapshot already reflects each symbol's latest mid.
+        return dict(self._account)
 
     async def submit_order(self, order: OrderRequest) -> OrderResult:
         if not self.connected:
             return OrderResult(False, 0, None, reason="Disconnected")
 
+        spread_half = self.config.simulated_spread * 0.5
+        slip = self.config.simulated_slippage
+        symbol = order.symbol
+
         await asyncio.sleep(self._latency_ms / 1000.0)
 
-        mid = self._last_prices.get(order.symbol)
+        mid = self._last_prices.get(symbol)
         if mid is None:
-            _, _, _, close = await asyncio.to_thread(self._fetch_price_sync)
+            prices = await self._fetch_price_cached([symbol])
+            _, _, _, close = prices[symbol]
             mid = close
-            self._last_prices[order.symbol] = mid
+            self._last_prices[symbol] = mid
 
-        spread = self.config.simulated_spread
-        bid = mid - spread / 2
-        ask = mid + spread / 2
-        fill_price = ask if order.side == "BUY" else bid
-        slip = self.config.simulated_slippage
-        fill_price += slip if order.side == "BUY" else -slip
+        # Fills cross half the spread plus slippage in the trade direction.
+        sign = int(order.side)
+        fill_price = mid + sign * (spread_half + slip)
 
-        position = self.positions.get(order.symbol, {"size": 0.0, "entry": fill_price, "pnl": 0.0})
-        signed_size = order.size if order.side == "BUY" else -order.size
+        size = order.size
+        positions = self.positions
+        position = positions.get(symbol) or Position(size=0.0, entry=fill_price)
+        old_abs_size = abs(position.size)
+        signed_size = sign * size
 
         # Realize PnL when reducing/closing, otherwise adjust average price when adding.
-        if position["size"] == 0 or (position["size"] > 0 and signed_size > 0) or (position["size"] < 0 and signed_size < 0):
-            new_size = position["size"] + signed_size
-            if position["size"] != 0:
-                position["entry"] = (
-                    position["entry"] * abs(position["size"]) + fill_price * abs(signed_size)
-                ) / abs(new_size)
-            position["size"] = new_size
+        if position.size * signed_size >= 0:
+            new_size = position.size + signed_size
+            if position.size != 0:
+                position.entry = (position.entry * old_abs_size + fill_price * size) / abs(new_size)
+            position.size = new_size
         else:
-            closing_size = min(abs(position["size"]), abs(signed_size))
-            realized = (fill_price - position["entry"]) * closing_size * (1 if position["size"] > 0 else -1)
+            closing_size = min(old_abs_size, size)
+            realized = (fill_price - position.entry) * math.copysign(closing_size, position.size)
             self.balance += realized
-            position["size"] = position["size"] + signed_size
-            if position["size"] == 0:
-                position["entry"] = 0.0
-            else:
-                position["entry"] = fill_price
+            position.size = position.size + signed_size
+            position.entry = fill_price if position.size != 0 else 0.0
 
-        position["pnl"] = (mid - position["entry"]) * position["size"]
-        if position["size"] == 0:
-            self.positions.pop(order.symbol, None)
+        position.pnl = (mid - position.entry) * position.size
+        if position.size == 0:
+            positions.pop(symbol, None)
         else:
-            self.positions[order.symbol] = position
+            positions[symbol] = position
 
-        self._mark_positions(mid)
+        self._mark_and_snapshot()
 
         order_id = f"{order.client_id}-{int(time.time() * 1000)}"
         logger.info(
             "Order filled id=%s side=%s size=%.4f price=%.2f sl=%.2f",
             order_id,
-            order.side,
+            order.side.name,
             order.size,
             fill_price,
             order.stop_loss,
@@ -7,6 +7,7 @@ import os
 class AppConfig:
     symbols: list[str] = field(default_factory=lambda: ["XAUUSD"])
     data_symbol: str = "GC=F"  # Yahoo Finance ticker for Gold futures fallback.
+    data_symbols: dict[str, str] = field(default_factory=dict)  # Per-symbol Yahoo tickers, e.g. XAGUSD -> SI=F.
     risk_per_trade: float = 0.005  # 0.5% of equity per trade.
     max_global_exposure: float = 2.0  # As a multiple of equity.
     max_symbol_exposure: float = 1.0  # As a multiple of equity per symbol.
@@ -42,9 +43,19 @@ class AppConfig:
                 return default
             return [item.strip() for item in raw.split(",") if item.strip()]
 
+        def get_mapping(name: str) -> dict[str, str]:
+            # Format: "XAUUSD:GC=F,XAGUSD:SI=F" (":" because Yahoo tickers may contain "=").
+            mapping: dict[str, str] = {}
+            for item in get_list(name, []):
+                key, sep, value = item.partition(":")
+                if sep and key.strip() and value.strip():
+                    mapping[key.strip()] = value.strip()
+            return mapping
+
         cfg = AppConfig(
             symbols=get_list("SYMBOLS", ["XAUUSD"]),
             data_symbol=os.environ.get("DATA_SYMBOL", "GC=F"),
+            data_symbols=get_mapping("DATA_SYMBOLS"),
             risk_per_trade=get_float("RISK_PER_TRADE", 0.005),
             max_global_exposure=get_float("MAX_GLOBAL_EXPOSURE", 2.0),
             max_symbol_exposure=get_float("MAX_SYMBOL_EXPOSURE", 1.0),
@@ -16,6 +16,9 @@ from .utils import compute_backoff, resilient_sleep
 
 logger = logging.getLogger("engine")
 
+PERSIST_INTERVAL = 5.0  # seconds between heartbeat state persists
+MAX_CONCURRENT_HANDLERS = 8
+
 
 class AsyncTradingEngine:
     """Coordinates data, risk checks, execution, and persistence."""
@@ -36,36 +39,62 @@ class AsyncTradingEngine:
         self.risk_manager = risk_manager
         self.config = config
 
-        self._price_queue: asyncio.Queue[PriceTick] = asyncio.Queue(maxsize=1000)
+        # Latest unprocessed tick per symbol: a lagging consumer skips stale ticks instead of
+        # back-pressuring the feed, and memory stays bounded by the number of symbols.
+        self._latest_ticks: dict[str, PriceTick] = {}
+        self._tick_event = asyncio.Event()
+        self._dropped_ticks = 0
+        # Tick handlers run as tasks so one symbol's fill latency does not hold back the others.
+        self._handler_sem = asyncio.Semaphore(MAX_CONCURRENT_HANDLERS)
+        self._handlers: set[asyncio.Task] = set()
         self._cancel_event = asyncio.Event()
-        self._tasks: list[asyncio.Task] = []
         self._state: dict = {}
-        self._last_persist = time.time()
+        self._persist_handle: asyncio.TimerHandle | None = None
+        # (monotonic time of last refresh, ISO date); rollover is noticed within a minute.
+        self._today_cache: tuple[float, str] = (float("-inf"), "")
+        # Producers flag a dropped feed; the watchdog reconnects and re-opens the gate.
+        self._disconnected = asyncio.Event()
+        self._connected = asyncio.Event()
 
     async def run(self, runtime_seconds: Optional[float] = None) -> None:
         self._state = await self.state_manager.load()
         self.risk_manager.daily_start_equity = self._state.get("daily_start_equity")
         self.risk_manager.equity_peak = self._state.get("equity_peak")
-        await self._connect_with_backoff()
-
-        producer = asyncio.create_task(self._price_producer())
-        consumer = asyncio.create_task(self._price_consumer())
-        monitor = asyncio.create_task(self._health_monitor())
-        self._tasks = [producer, consumer, monitor]
-
-        if runtime_seconds:
-            await resilient_sleep(runtime_seconds, self._cancel_event)
-            await self.stop()
-        else:
-            await asyncio.gather(*self._tasks)
+        self.state_manager.start()
+        try:
+            await self._connect_with_backoff()
+            self._persist_handle = asyncio.get_running_loop().call_later(PERSIST_INTERVAL, self._persist_cb)
+
+            # A failing worker cancels its siblings and surfaces here instead of being swallowed.
+            async with asyncio.TaskGroup() as tg:
+                workers = [
+                    tg.create_task(self._price_producer()),
+                    tg.create_task(self._price_consumer()),
+                    tg.create_task(self._connection_watchdog()),
+                ]
+                if runtime_seconds:
+                    await resilient_sleep(runtime_seconds, self._cancel_event)
+                else:
+                    await self._cancel_event.wait()
+                self._cancel_event.set()
+                for worker in workers:
+                    worker.cancel()
+        finally:
+            await self._shutdown()
 
     async def stop(self) -> None:
+        """Request shutdown; run() unwinds its task group and cleans up."""
         self._cancel_event.set()
-        for task in self._tasks:
-            task.cancel()
-        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def _shutdown(self) -> None:
+        if self._persist_handle is not None:
+            self._persist_handle.cancel()
+        for handler in list(self._handlers):
+            handler.cancel()
+        await asyncio.gather(*self._handlers, return_exceptions=True)
         await self.broker.close()
-        await self.state_manager.persist(self._state)
+        await self.state_manager.close()
+        await self.state_manager.persist(self._state, durable=True)
         logger.info("Engine stopped gracefully")
 
     async def _connect_with_backoff(self) -> None:
@@ -73,32 +102,59 @@ class AsyncTradingEngine:
         while not self.broker.connected and not self._cancel_event.is_set():
             try:
                 await self.broker.connect()
-                return
+                break
             except Exception as exc:
                 delay = compute_backoff(attempt, self.config.reconnect_base, self.config.reconnect_max)
                 logger.error("Broker connection failed (%s). Retrying in %.1fs", exc, delay)
                 attempt += 1
                 await resilient_sleep(delay, self._cancel_event)
+        if self.broker.connected:
+            self._connected.set()
 
     async def _price_producer(self) -> None:
+        # One stream per symbol so a slow quote for one instrument never delays the others.
+        await asyncio.gather(*(self._pump(symbol) for symbol in self.config.symbols))
+
+    async def _pump(self, symbol: str) -> None:
         while not self._cancel_event.is_set():
+            await self._connected.wait()
             try:
-                async for tick in self.broker.price_stream(self.config.symbols):
-                    await self._price_queue.put(tick)
+                async for tick in self.broker.price_stream([symbol]):
+                    if tick.symbol in self._latest_ticks:
+                        self._dropped_ticks += 1
+                    self._latest_ticks[tick.symbol] = tick
+                    self._tick_event.set()
                     if self._cancel_event.is_set():
                         break
             except Exception as exc:
-                logger.error("Price stream error: %s", exc)
-                await self._connect_with_backoff()
+                logger.error("Price stream error for %s: %s", symbol, exc)
+            if not self._cancel_event.is_set():
+                self._connected.clear()
+                self._disconnected.set()
 
     async def _price_consumer(self) -> None:
         while not self._cancel_event.is_set():
-            tick = await self._price_queue.get()
-            await self._handle_tick(tick)
+            await self._tick_event.wait()
+            self._tick_event.clear()
+            ticks, self._latest_ticks = self._latest_ticks, {}
+            for tick in ticks.values():
+                handler = asyncio.create_task(self._handle_tick_sem(tick))
+                self._handlers.add(handler)
+                handler.add_done_callback(self._handlers.discard)
+
+    async def _handle_tick_sem(self, tick: PriceTick) -> None:
+        async with self._handler_sem:
+            try:
+                await self._handle_tick(tick)
+            except Exception:
+                logger.exception("Tick handler failed for %s", tick.symbol)
 
     async def _handle_tick(self, tick: PriceTick) -> None:
         account = await self.broker.get_account_info()
-        today = datetime.date.today().isoformat()
+        now = time.monotonic()
+        if now - self._today_cache[0] > 60:
+            self._today_cache = (now, datetime.date.today().isoformat())
+        today = self._today_cache[1]
         if self._state.get("trading_day") != today:
             self._state["trading_day"] = today
             self.risk_manager.daily_start_equity = account["equity"]
@@ -110,7 +166,7 @@ class AsyncTradingEngine:
         self._state["equity_peak"] = self.risk_manager.equity_peak
 
         decision = self._map_strategy_decision(self.strategy.get_signal(tick))
-        if decision.signal == "HOLD":
+        if decision.signal is Signal.HOLD:
             return
 
         result = await self.order_handler.execute(
@@ -120,24 +176,27 @@ class AsyncTradingEngine:
             positions=self.broker.positions,
         )
         if result.success:
-            await self.state_manager.persist(self._state)
+            self.state_manager.schedule(self._state, durable=True)
 
     def _map_strategy_decision(self, strategy_decision) -> ExecutionDecision:
-        signal = strategy_decision.signal
-        if signal not in (Signal.BUY, Signal.SELL, Signal.HOLD):
+        try:
+            signal = Signal(strategy_decision.signal)
+        except ValueError:
             signal = Signal.HOLD
         return ExecutionDecision(signal=signal, stop_loss=strategy_decision.stop_loss, take_profit=strategy_decision.take_profit)
 
-    async def _health_monitor(self) -> None:
-        """Continuously ensure connectivity and log latency/pressure."""
+    def _persist_cb(self) -> None:
+        """Periodic heartbeat persist; re-arms itself on the loop's monotonic clock."""
+        if self._dropped_ticks:
+            logger.warning("Consumer lagging; skipped %s stale ticks", self._dropped_ticks)
+            self._dropped_ticks = 0
+        self.state_manager.schedule(self._state)
+        self._persist_handle = asyncio.get_running_loop().call_later(PERSIST_INTERVAL, self._persist_cb)
+
+    async def _connection_watchdog(self) -> None:
+        """Sleep until a price stream reports a dropped feed, then reconnect."""
         while not self._cancel_event.is_set():
-            if not self.broker.connected:
-                logger.warning("Broker disconnected; attempting reconnection")
-                await self._connect_with_backoff()
-            queue_depth = self._price_queue.qsize()
-            if queue_depth > 500:
-                logger.warning("Price queue pressure detected depth=%s", queue_depth)
-            if time.time() - self._last_persist > 5:
-                await self.state_manager.persist(self._state)
-                self._last_persist = time.time()
-            await resilient_sleep(1.0, self._cancel_event)
+            await self._disconnected.wait()
+            self._disconnected.clear()
+            logger.warning("Broker disconnected; attempting reconnection")
+            await self._connect_with_backoff()
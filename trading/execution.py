@@ -3,16 +3,17 @@ from __future__ import annotations
 import logging
 from dataclasses import dataclass
 
-from .broker import OrderRequest, OrderResult, PriceTick, PaperBrokerClient
+from .broker import OrderRequest, OrderResult, PriceTick, PaperBrokerClient, Side
 from .config import AppConfig
 from .risk import RiskManager, OrderContext, RiskViolation
+from .strategy import Signal
 
 logger = logging.getLogger("execution")
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ExecutionDecision:
-    signal: str  # BUY, SELL, or HOLD
+    signal: Signal
     stop_loss: float | None
     take_profit: float | None
 
@@ -24,9 +25,14 @@ class OrderHandler:
         self.broker = broker
         self.risk_manager = risk_manager
         self.config = config
+        # Signed sizes of orders submitted but not yet filled, so concurrent ticks see in-flight exposure,
+        # plus the aggregate notional those orders add on top of the broker's figure. Sizes are
+        # kept individually so a finished order is removed exactly, without float residue.
+        self._pending: dict[str, list[float]] = {}
+        self._pending_notional = 0.0
 
     async def execute(self, tick: PriceTick, decision: ExecutionDecision, account: dict, positions: dict) -> OrderResult:
-        if decision.signal == "HOLD":
+        if decision.signal is Signal.HOLD:
             return OrderResult(True, 0, None, reason="No action")
 
         if decision.stop_loss is None:
@@ -38,30 +44,36 @@ class OrderHandler:
         if tick.volatility > self.config.volatility_limit:
             return OrderResult(False, 0, None, reason="Volatility too high")
 
-        side = "BUY" if decision.signal == "BUY" else "SELL"
+        side = Side.BUY if decision.signal is Signal.BUY else Side.SELL
         ctx = OrderContext(
             symbol=tick.symbol,
             side=side,
-            price=tick.ask if side == "BUY" else tick.bid,
+            price=tick.ask if side is Side.BUY else tick.bid,
             stop_loss=decision.stop_loss,
             take_profit=decision.take_profit,
             spread=tick.spread,
             volatility=tick.volatility,
         )
 
-        if side == "BUY" and ctx.stop_loss >= ctx.price:
+        if side is Side.BUY and ctx.stop_loss >= ctx.price:
             return OrderResult(False, 0, None, reason="Stop-loss must be below entry for BUY")
-        if side == "SELL" and ctx.stop_loss <= ctx.price:
+        if side is Side.SELL and ctx.stop_loss <= ctx.price:
             return OrderResult(False, 0, None, reason="Stop-loss must be above entry for SELL")
 
+        symbol = tick.symbol
+        position = positions.get(symbol)
+        in_flight = self._pending.get(symbol)
+        net_size = (position.size if position is not None else 0.0) + (sum(in_flight) if in_flight else 0.0)
+        if self._pending_notional:
+            account = {**account, "aggregate_notional": account["aggregate_notional"] + self._pending_notional}
         try:
-            size = self.risk_manager.validate_order(ctx, account=account, positions=positions)
+            size = self.risk_manager.validate_order(ctx, account=account, symbol_size=net_size)
         except RiskViolation as exc:
             logger.warning("Order rejected by risk manager: %s", exc)
             return OrderResult(False, 0, None, reason=str(exc))
 
         order = OrderRequest(
-            symbol=tick.symbol,
+            symbol=symbol,
             side=side,
             size=size,
             price=ctx.price,
@@ -71,14 +83,28 @@ class OrderHandler:
             time_in_force="IOC",
             client_id=self.config.magic_number,
         )
-        result = await self.broker.submit_order(order)
+        signed_size = side * size
+        added_notional = (abs(net_size + signed_size) - abs(net_size)) * ctx.price
+        self._pending.setdefault(symbol, []).append(signed_size)
+        self._pending_notional += added_notional
+        try:
+            result = await self.broker.submit_order(order)
+        finally:
+            in_flight = self._pending[symbol]
+            in_flight.remove(signed_size)
+            if not in_flight:
+                del self._pending[symbol]
+            if self._pending:
+                self._pending_notional -= added_notional
+            else:
+                self._pending_notional = 0.0
         if not result.success:
             logger.error("Order submission failed: %s", result.reason)
             return result
 
         logger.info(
             "Order executed side=%s size=%.4f price=%.5f sl=%.5f tp=%s",
-            side,
+            side.name,
             result.filled_size,
             result.avg_price,
             decision.stop_loss,
@@ -3,6 +3,7 @@ from __future__ import annotations
 import logging
 from dataclasses import dataclass
 
+from .broker import Side
 from .config import AppConfig
 
 logger = logging.getLogger("risk")
@@ -11,7 +12,7 @@ logger = logging.getLogger("risk")
 @dataclass
 class OrderContext:
     symbol: str
-    side: str
+    side: Side
     price: float
     stop_loss: float
     take_profit: float | None
@@ -52,19 +53,17 @@ class RiskManager:
         if equity <= (self.equity_peak * (1 - self.config.max_drawdown)):
             raise RiskViolation("Max drawdown breached; trading halted")
 
-    def _check_leverage_and_exposure(
-        self, symbol: str, price: float, size: float, account: dict, positions: dict
-    ) -> None:
+    def _check_leverage_and_exposure(self, price: float, size: float, account: dict, symbol_size: float) -> None:
         notional = price * size
         projected_margin = account["margin_used"] + notional / self.config.leverage_limit
         if projected_margin > account["equity"]:
             raise RiskViolation("Insufficient margin for order")
 
-        current_symbol_notional = abs(positions.get(symbol, {}).get("size", 0.0) * price)
+        current_symbol_notional = abs(symbol_size * price)
         if current_symbol_notional + notional > account["equity"] * self.config.max_symbol_exposure:
             raise RiskViolation("Per-symbol exposure limit exceeded")
 
-        aggregate_notional = sum(abs(pos["size"] * price) for pos in positions.values())
+        aggregate_notional = account["aggregate_notional"]
         if aggregate_notional + notional > account["equity"] * self.config.max_global_exposure:
             raise RiskViolation("Global exposure limit exceeded")
 
@@ -72,9 +71,9 @@ class RiskManager:
         self,
         ctx: OrderContext,
         account: dict,
-        positions: dict,
+        symbol_size: float,
     ) -> float:
-        """Return approved position size if risk rules pass."""
+        """Return approved position size if risk rules pass; symbol_size is the order symbol's net signed size."""
         self._check_circuit_breakers(account["equity"])
 
         stop_distance = abs(ctx.price - ctx.stop_loss)
@@ -82,5 +81,5 @@ class RiskManager:
         if size <= 0:
             raise RiskViolation("Computed size is zero; reject order")
 
-        self._check_leverage_and_exposure(ctx.symbol, ctx.price, size, account, positions)
+        self._check_leverage_and_exposure(ctx.price, size, account, symbol_size)
         return size
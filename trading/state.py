@@ -1,15 +1,34 @@
 from __future__ import annotations
 
 import asyncio
-import json
+import hashlib
 import logging
+import os
 from pathlib import Path
 from typing import Any
 import datetime
 
+import orjson
+
 logger = logging.getLogger("state")
 
 
+def _write_replace(path: Path, payload: bytes, fsync: bool = True) -> None:
+    """Write a temp file and atomically rename it over the target.
+
+    The rename means a crash mid-write never leaves a truncated state file behind. fsync=False skips
+    the flush to disk for best-effort heartbeat writes; the previous file stays intact until the
+    rename, so only a power loss can cost that write.
+    """
+    temp_path = path.with_suffix(".tmp")
+    with open(temp_path, "wb") as fh:
+        fh.write(payload)
+        if fsync:
+            fh.flush()
+            os.fsync(fh.fileno())
+    os.replace(temp_path, path)
+
+
 class StateManager:
     """Durable state for restart continuity."""
 
@@ -17,24 +36,82 @@ class StateManager:
         self.path = path
         self.initial_balance = initial_balance
         self._lock = asyncio.Lock()
+        self._last_hash: bytes | None = None
+        self._last_durable = False
+        self._dirty = asyncio.Event()
+        self._write_pending = False
+        self._durable_pending = False
+        self._closing = False
+        self._latest: dict[str, Any] = {}
+        self._writer: asyncio.Task | None = None
         self.path.parent.mkdir(parents=True, exist_ok=True)
 
+    def start(self) -> None:
+        """Launch the background writer that services schedule()."""
+        if self._writer is None or self._writer.done():
+            self._closing = False
+            self._writer = asyncio.create_task(self._writer_loop())
+
+    async def close(self) -> None:
+        """Let the writer finish any scheduled write, then stop it.
+
+        Cancelling instead would release the lock while the write thread is still running, and a
+        following persist() would race it on the temp file.
+        """
+        if self._writer is not None:
+            self._closing = True
+            self._dirty.set()
+            await asyncio.gather(self._writer, return_exceptions=True)
+            self._writer = None
+
+    def schedule(self, state: dict[str, Any], durable: bool = False) -> None:
+        """Mark state dirty; the writer coalesces every schedule since its last write into one persist.
+
+        The coalesced write is durable if any of the schedules it covers asked for durability.
+        """
+        self._latest = state
+        self._write_pending = True
+        self._durable_pending = self._durable_pending or durable
+        self._dirty.set()
+
+    async def _writer_loop(self) -> None:
+        while True:
+            await self._dirty.wait()
+            self._dirty.clear()
+            if self._write_pending:
+                self._write_pending = False
+                durable, self._durable_pending = self._durable_pending, False
+                try:
+                    await self.persist(self._latest, durable=durable)
+                except Exception as exc:
+                    logger.error("State persist failed: %s", exc)
+            if self._closing:
+                return
+
     async def load(self) -> dict[str, Any]:
         async with self._lock:
             if not self.path.exists():
                 return self._default_state()
             try:
-                content = self.path.read_text(encoding="utf-8")
-                return json.loads(content)
-            except json.JSONDecodeError:
+                content = await asyncio.to_thread(self.path.read_bytes)
+                return orjson.loads(content)
+            except orjson.JSONDecodeError:
                 logger.error("State file corrupted; falling back to defaults")
                 return self._default_state()
 
-    async def persist(self, state: dict[str, Any]) -> None:
+    async def persist(self, state: dict[str, Any], durable: bool = False) -> None:
+        """Write state to disk; durable writes survive crashes, heartbeat writes are best-effort."""
+        payload = orjson.dumps(state)
+        digest = hashlib.blake2b(payload, digest_size=8).digest()
         async with self._lock:
-            temp_path = self.path.with_suffix(".tmp")
-            temp_path.write_text(json.dumps(state, indent=2), encoding="utf-8")
-            temp_path.replace(self.path)
+            # Most periodic persists carry unchanged state; skip the disk write for those
+            # unless durability is requested for content that was only written best-effort.
+            if digest == self._last_hash and (self._last_durable or not durable):
+                return
+            # Disk I/O runs off the loop thread; the lock still serializes writers.
+            await asyncio.to_thread(_write_replace, self.path, payload, durable)
+            self._last_hash = digest
+            self._last_durable = durable
 
     def _default_state(self) -> dict[str, Any]:
         return {
@@ -1,30 +1,93 @@
 from __future__ import annotations
 
-import collections
 from dataclasses import dataclass
+from enum import IntEnum
 
+import numpy as np
+
+from . import strategy_vec
+from .strategy_vec import SIGNAL_BUY, SIGNAL_SELL, tick_kernel
 from .broker import PriceTick
 
+# Columns of TrendFollowingStrategy.state (one row per symbol). The SEED_* columns hold the
+# running gain/loss sums and delta count while the RSI averages are still being seeded.
+FAST, SLOW, ATR, PREV_CLOSE, AVG_GAIN, AVG_LOSS, SEED_GAIN, SEED_LOSS, SEED_COUNT = range(9)
+EMPTY_STATE = (np.nan,) * 6 + (0.0, 0.0, 0.0)
+
 
-class Signal:
-    BUY = "BUY"
-    SELL = "SELL"
-    HOLD = "HOLD"
+class Signal(IntEnum):
+    # Same codes the compiled kernels emit, so a kernel result maps straight onto a member.
+    HOLD = strategy_vec.SIGNAL_HOLD
+    BUY = strategy_vec.SIGNAL_BUY
+    SELL = strategy_vec.SIGNAL_SELL
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class StrategyDecision:
-    signal: str
+    signal: Signal
     stop_loss: float | None
     take_profit: float | None
 
 
+# Shared result for the common no-trade tick, so HOLD does not allocate.
+HOLD_DECISION = StrategyDecision(Signal.HOLD, None, None)
+
+
 class BaseStrategy:
     def get_signal(self, tick: PriceTick) -> StrategyDecision:
         raise NotImplementedError
 
 
-class TrendFollowingStrategy(BaseStrategy):
+class _TrendFollowingParams:
+    """Periods, precomputed kernel constants and the stateless batch path shared by the trend strategies."""
+
+    def _set_params(
+        self, fast_period: int, slow_period: int, rsi_period: int, atr_period: int, atr_multiplier: float
+    ) -> None:
+        self.fast_period = fast_period
+        self.slow_period = slow_period
+        self.rsi_period = rsi_period
+        self.atr_period = atr_period
+        self.atr_multiplier = atr_multiplier
+        # Periods are fixed for the strategy's lifetime, so the per-tick smoothing needs no divisions.
+        (
+            self._k_fast,
+            self._k_slow,
+            self._rsi_alpha,
+            self._rsi_one_minus,
+            self._atr_alpha,
+            self._atr_one_minus,
+        ) = strategy_vec.smoothing_constants(fast_period, slow_period, rsi_period, atr_period)
+        # Trailing tick_kernel arguments, bound once so get_signal passes them with a single attribute load.
+        self._kernel_params = (
+            self._k_fast,
+            self._k_slow,
+            rsi_period,
+            self._rsi_alpha,
+            self._rsi_one_minus,
+            self._atr_alpha,
+            self._atr_one_minus,
+            atr_multiplier,
+        )
+
+    def process_batch(self, closes, highs, lows) -> tuple[np.ndarray, np.ndarray]:
+        """Evaluate the strategy over whole price arrays for backtests; live per-symbol state is untouched.
+
+        Returns per-bar signal codes (see strategy_vec.SIGNAL_*) and stop-loss levels (NaN on HOLD).
+        """
+        return strategy_vec.process_batch(
+            closes,
+            highs,
+            lows,
+            fast_period=self.fast_period,
+            slow_period=self.slow_period,
+            rsi_period=self.rsi_period,
+            atr_period=self.atr_period,
+            atr_multiplier=self.atr_multiplier,
+        )
+
+
+class TrendFollowingStrategy(_TrendFollowingParams, BaseStrategy):
     """EMA crossover + RSI filter + ATR-based stop for XAUUSD paper trading."""
 
     def __init__(
@@ -34,105 +97,211 @@ class TrendFollowingStrategy(BaseStrategy):
         rsi_period: int = 14,
         atr_period: int = 14,
         atr_multiplier: float = 2.0,
+        initial_capacity: int = 4,
     ) -> None:
-        self.fast_period = fast_period
-        self.slow_period = slow_period
-        self.rsi_period = rsi_period
-        self.atr_period = atr_period
-        self.atr_multiplier = atr_multiplier
+        self._set_params(fast_period, slow_period, rsi_period, atr_period, atr_multiplier)
+
+        # Per-symbol indicator state as rows of one float64 array; NaN means "not yet initialized".
+        capacity = max(initial_capacity, 1)
+        self.symbol_idx: dict[str, int] = {}
+        self.state = np.tile(EMPTY_STATE, (capacity, 1))
+
+    @classmethod
+    def for_symbol(
+        cls,
+        symbol: str,
+        fast_period: int = 9,
+        slow_period: int = 21,
+        rsi_period: int = 14,
+        atr_period: int = 14,
+        atr_multiplier: float = 2.0,
+    ) -> SingleSymbolTrendFollowing:
+        """Same strategy specialized to one instrument, with no per-tick symbol lookup."""
+        return SingleSymbolTrendFollowing(symbol, fast_period, slow_period, rsi_period, atr_period, atr_multiplier)
 
-        self.fast_ema: dict[str, float | None] = {}
-        self.slow_ema: dict[str, float | None] = {}
-        self.atr: dict[str, float | None] = {}
-        self.prev_close: dict[str, float | None] = {}
-        self.avg_gain: dict[str, float | None] = {}
-        self.avg_loss: dict[str, float | None] = {}
-        self.rsi_seed: dict[str, collections.deque[float]] = {}
-
-    def _ema(self, price: float, prev: float | None, period: int) -> float:
-        if prev is None:
-            return price
-        k = 2 / (period + 1)
-        return price * k + prev * (1 - k)
-
-    def _update_rsi(self, symbol: str, close: float) -> float | None:
-        prev = self.prev_close.get(symbol)
-        if prev is None:
-            self.prev_close[symbol] = close
-            return None
-
-        delta = close - prev
-        gain = max(delta, 0.0)
-        loss = max(-delta, 0.0)
-
-        if symbol not in self.avg_gain or self.avg_gain[symbol] is None:
-            seed = self.rsi_seed.setdefault(symbol, collections.deque(maxlen=self.rsi_period))
-            seed.append(delta)
-            if len(seed) < self.rsi_period:
-                self.prev_close[symbol] = close
-                return None
-            gains = [max(x, 0.0) for x in seed]
-            losses = [max(-x, 0.0) for x in seed]
-            self.avg_gain[symbol] = sum(gains) / self.rsi_period
-            self.avg_loss[symbol] = sum(losses) / self.rsi_period
-        else:
-            self.avg_gain[symbol] = (self.avg_gain[symbol] * (self.rsi_period - 1) + gain) / self.rsi_period
-            self.avg_loss[symbol] = (self.avg_loss[symbol] * (self.rsi_period - 1) + loss) / self.rsi_period
-
-        self.prev_close[symbol] = close
-        avg_gain = self.avg_gain[symbol] or 0.0
-        avg_loss = self.avg_loss[symbol] or 0.0
-        if avg_loss == 0:
-            return 100.0
-        rs = avg_gain / avg_loss
-        return 100 - (100 / (1 + rs))
-
-    def _update_atr(self, symbol: str, high: float, low: float, close: float) -> float | None:
-        prev_close = self.prev_close.get(symbol)
-        tr = (
-            max(
-                high - low,
-                abs(high - prev_close) if prev_close is not None else 0.0,
-                abs(low - prev_close) if prev_close is not None else 0.0,
-            )
-            if prev_close is not None
-            else high - low
+    def _row(self, symbol: str) -> int:
+        i = self.symbol_idx.get(symbol)
+        if i is not None:
+            return i
+        i = len(self.symbol_idx)
+        capacity = self.state.shape[0]
+        if i == capacity:
+            # Grow geometrically so adding symbols stays amortized O(1).
+            self.state = np.vstack([self.state, np.tile(EMPTY_STATE, (capacity, 1))])
+        self.symbol_idx[symbol] = i
+        return i
+
+    def warmup(self, symbol: str, closes, highs, lows) -> None:
+        """Advance symbol's live state over historical bars, as if each had arrived through get_signal.
+
+        Continues from whatever state the symbol already has, so a walk-forward run can warm up once
+        and then keep feeding windows without reseeding.
+        """
+        close, high, low = strategy_vec.bar_arrays(closes, highs, lows)
+        i = self._row(symbol)  # before touching self.state: _row may grow (replace) the array
+        strategy_vec.warmup_kernel(
+            close,
+            high,
+            low,
+            self.state[i],
+            self._k_fast,
+            self._k_slow,
+            self.rsi_period,
+            self._rsi_alpha,
+            self._rsi_one_minus,
+            self._atr_alpha,
+            self._atr_one_minus,
         )
-        prev_atr = self.atr.get(symbol)
-        if prev_atr is None:
-            self.atr[symbol] = tr
-        else:
-            self.atr[symbol] = (prev_atr * (self.atr_period - 1) + tr) / self.atr_period
-        return self.atr[symbol]
 
-    def get_signal(self, tick: PriceTick) -> StrategyDecision:
-        close = tick.close if tick.close is not None else (tick.bid + tick.ask) / 2
-        high = tick.high if tick.high is not None else close
-        low = tick.low if tick.low is not None else close
+    def process_bulk_ticks(self, ticks: list[PriceTick]) -> list[tuple[str, StrategyDecision]]:
+        """Advance a batch of ticks in one compiled call; returns (symbol, decision) for non-HOLD ticks only.
 
-        prev_fast = self.fast_ema.get(tick.symbol)
-        prev_slow = self.slow_ema.get(tick.symbol)
+        Ticks are applied in order, so several ticks for one symbol behave like successive get_signal calls.
+        """
+        n = len(ticks)
+        rows = np.fromiter((self._row(tick.symbol) for tick in ticks), dtype=np.intp, count=n)
+        signals, stops = strategy_vec.bulk_tick_kernel(
+            rows,
+            np.fromiter((tick.close for tick in ticks), dtype=np.float64, count=n),
+            np.fromiter((tick.high for tick in ticks), dtype=np.float64, count=n),
+            np.fromiter((tick.low for tick in ticks), dtype=np.float64, count=n),
+            self.state,
+            *self._kernel_params,
+        )
+        # HOLD is the common case; only the signalling ticks get a decision object.
+        hits = np.flatnonzero(signals)
+        return [
+            (ticks[j].symbol, StrategyDecision(Signal(code), stop_loss=stop, take_profit=None))
+            for j, code, stop in zip(hits.tolist(), signals[hits].tolist(), stops[hits].tolist())
+        ]
 
-        fast = self._ema(close, prev_fast, self.fast_period)
-        slow = self._ema(close, prev_slow, self.slow_period)
-        self.fast_ema[tick.symbol] = fast
-        self.slow_ema[tick.symbol] = slow
+    def get_state(self, symbol: str) -> tuple[float, ...]:
+        """Snapshot of symbol's indicator state in column order (see FAST..SEED_COUNT)."""
+        i = self.symbol_idx.get(symbol)
+        if i is None:
+            return EMPTY_STATE
+        return tuple(self.state[i].tolist())
 
-        atr = self._update_atr(tick.symbol, high, low, close)
-        rsi = self._update_rsi(tick.symbol, close)
+    def set_state(self, symbol: str, state: tuple[float, ...]) -> None:
+        """Restore a snapshot from get_state, e.g. to fork one warmed-up state into several scenarios."""
+        if len(state) != len(EMPTY_STATE):
+            raise ValueError(f"Expected {len(EMPTY_STATE)} state values, got {len(state)}")
+        i = self._row(symbol)
+        self.state[i] = state
 
-        if prev_fast is None or prev_slow is None or atr is None or rsi is None:
-            return StrategyDecision(Signal.HOLD, None, None)
+    def get_signal(self, tick: PriceTick) -> StrategyDecision:
+        close = tick.close
+        i = self._row(tick.symbol)
+        state = self.state  # after _row, which may have grown (replaced) the array
+        prev_fast, prev_slow, atr, prev_close, avg_gain, avg_loss, seed_gain, seed_loss, seed_count = state[i].tolist()
 
-        bullish_cross = prev_fast <= prev_slow and fast > slow and rsi < 70
-        bearish_cross = prev_fast >= prev_slow and fast < slow and rsi > 30
+        fast, slow, atr, avg_gain, avg_loss, seed_gain, seed_loss, seed_count, code, stop = tick_kernel(
+            close,
+            tick.high,
+            tick.low,
+            prev_close,
+            prev_fast,
+            prev_slow,
+            atr,
+            avg_gain,
+            avg_loss,
+            seed_gain,
+            seed_loss,
+            seed_count,
+            *self._kernel_params,
+        )
+        state[i] = (fast, slow, atr, close, avg_gain, avg_loss, seed_gain, seed_loss, seed_count)
 
-        stop_distance = self.atr_multiplier * atr
-        if bullish_cross:
-            stop = close - stop_distance
+        if code == SIGNAL_BUY:
             return StrategyDecision(Signal.BUY, stop_loss=stop, take_profit=None)
-        if bearish_cross:
-            stop = close + stop_distance
+        if code == SIGNAL_SELL:
             return StrategyDecision(Signal.SELL, stop_loss=stop, take_profit=None)
+        return HOLD_DECISION
+
+
+class SingleSymbolTrendFollowing(_TrendFollowingParams, BaseStrategy):
+    """The TrendFollowingStrategy algorithm specialized to a single instrument.
 
-        return StrategyDecision(Signal.HOLD, None, None)
+    State is one plain tuple in the FAST..SEED_COUNT column order instead of a row of the per-symbol
+    array, so a tick costs no dict lookup and no array read/write. Ticks for other symbols are HOLD.
+    """
+
+    def __init__(
+        self,
+        symbol: str,
+        fast_period: int = 9,
+        slow_period: int = 21,
+        rsi_period: int = 14,
+        atr_period: int = 14,
+        atr_multiplier: float = 2.0,
+    ) -> None:
+        self._set_params(fast_period, slow_period, rsi_period, atr_period, atr_multiplier)
+        self.symbol = symbol
+        self.state = EMPTY_STATE
+
+    def warmup(self, symbol: str, closes, highs, lows) -> None:
+        if symbol != self.symbol:
+            raise ValueError(f"Strategy is bound to {self.symbol}, not {symbol}")
+        close, high, low = strategy_vec.bar_arrays(closes, highs, lows)
+        row = np.array(self.state)
+        strategy_vec.warmup_kernel(
+            close,
+            high,
+            low,
+            row,
+            self._k_fast,
+            self._k_slow,
+            self.rsi_period,
+            self._rsi_alpha,
+            self._rsi_one_minus,
+            self._atr_alpha,
+            self._atr_one_minus,
+        )
+        self.state = tuple(row.tolist())
+
+    def process_bulk_ticks(self, ticks: list[PriceTick]) -> list[tuple[str, StrategyDecision]]:
+        decisions = []
+        for tick in ticks:
+            decision = self.get_signal(tick)
+            if decision is not HOLD_DECISION:
+                decisions.append((tick.symbol, decision))
+        return decisions
+
+    def get_state(self, symbol: str) -> tuple[float, ...]:
+        return self.state if symbol == self.symbol else EMPTY_STATE
+
+    def set_state(self, symbol: str, state: tuple[float, ...]) -> None:
+        if symbol != self.symbol:
+            raise ValueError(f"Strategy is bound to {self.symbol}, not {symbol}")
+        if len(state) != len(EMPTY_STATE):
+            raise ValueError(f"Expected {len(EMPTY_STATE)} state values, got {len(state)}")
+        self.state = tuple(float(x) for x in state)
+
+    def get_signal(self, tick: PriceTick) -> StrategyDecision:
+        if tick.symbol != self.symbol:
+            return HOLD_DECISION
+        close = tick.close
+        prev_fast, prev_slow, atr, prev_close, avg_gain, avg_loss, seed_gain, seed_loss, seed_count = self.state
+
+        fast, slow, atr, avg_gain, avg_loss, seed_gain, seed_loss, seed_count, code, stop = tick_kernel(
+            close,
+            tick.high,
+            tick.low,
+            prev_close,
+            prev_fast,
+            prev_slow,
+            atr,
+            avg_gain,
+            avg_loss,
+            seed_gain,
+            seed_loss,
+            seed_count,
+            *self._kernel_params,
+        )
+        self.state = (fast, slow, atr, close, avg_gain, avg_loss, seed_gain, seed_loss, seed_count)
+
+        if code == SIGNAL_BUY:
+            return StrategyDecision(Signal.BUY, stop_loss=stop, take_profit=None)
+        if code == SIGNAL_SELL:
+            return StrategyDecision(Signal.SELL, stop_loss=stop, take_profit=None)
+        return HOLD_DECISION
@@ -0,0 +1,351 @@
+"""Compiled kernels for TrendFollowingStrategy: the live per-tick update and the batch (backtest) path.
+
+Both share the same EMA/Wilder recurrences; the serial loops are numba-compiled when available
+and batch cross detection is fully vectorized. NaN marks "not yet initialized" state.
+"""
+from __future__ import annotations
+
+import math
+
+import numpy as np
+
+from ._njit import njit
+
+# Signal codes used in the returned signal arrays.
+SIGNAL_HOLD = 0
+SIGNAL_BUY = 1
+SIGNAL_SELL = 2
+
+
+def bar_arrays(closes, highs, lows) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Contiguous float64 close/high/low arrays for the kernels, which do no bounds checking once compiled."""
+    close = np.ascontiguousarray(closes, dtype=np.float64)
+    high = np.ascontiguousarray(highs, dtype=np.float64)
+    low = np.ascontiguousarray(lows, dtype=np.float64)
+    if high.shape != close.shape or low.shape != close.shape:
+        raise ValueError(f"highs {high.shape} and lows {low.shape} must match closes {close.shape}")
+    return close, high, low
+
+
+@njit(cache=True)
+def smoothing_constants(
+    fast_period: int, slow_period: int, rsi_period: int, atr_period: int
+) -> tuple[float, float, float, float, float, float]:
+    """k for both EMAs, then (alpha, 1 - alpha) for the Wilder RSI and ATR averages."""
+    k_fast = 2.0 / (fast_period + 1)
+    k_slow = 2.0 / (slow_period + 1)
+    rsi_alpha = 1.0 / rsi_period
+    atr_alpha = 1.0 / atr_period
+    return (
+        k_fast,
+        k_slow,
+        rsi_alpha,
+        (rsi_period - 1) / rsi_period,
+        atr_alpha,
+        (atr_period - 1) / atr_period,
+    )
+
+
+@njit(cache=True)
+def tick_kernel(
+    close: float,
+    high: float,
+    low: float,
+    prev_close: float,
+    prev_fast: float,
+    prev_slow: float,
+    atr: float,
+    avg_gain: float,
+    avg_loss: float,
+    seed_gain: float,
+    seed_loss: float,
+    seed_count: float,
+    k_fast: float,
+    k_slow: float,
+    rsi_period: int,
+    rsi_alpha: float,
+    rsi_one_minus: float,
+    atr_alpha: float,
+    atr_one_minus: float,
+    atr_multiplier: float,
+) -> tuple[float, float, float, float, float, float, float, float, int, float]:
+    """Advance one symbol by one tick.
+
+    The smoothing constants are precomputed by the caller (see smoothing_constants) so the tick path
+    does no divisions. Returns (fast, slow, atr, avg_gain, avg_loss, seed_gain, seed_loss, seed_count, signal_code, stop).
+    While avg_gain is NaN the RSI is seeding: seed_gain/seed_loss are running sums over the first
+    rsi_period deltas (seed_count of them so far), turned into the Wilder averages on the last one.
+    """
+    if math.isnan(prev_fast):
+        fast = close
+    else:
+        fast = prev_fast + k_fast * (close - prev_fast)
+    if math.isnan(prev_slow):
+        slow = close
+    else:
+        slow = prev_slow + k_slow * (close - prev_slow)
+
+    if math.isnan(prev_close):
+        tr = high - low
+    else:
+        # Pairwise compares instead of max() over a tuple: plain maxsd/andpd once compiled.
+        tr = high - low
+        abs_hc = abs(high - prev_close)
+        abs_lc = abs(low - prev_close)
+        tr = tr if tr > abs_hc else abs_hc
+        tr = tr if tr > abs_lc else abs_lc
+    if math.isnan(atr):
+        atr = tr
+    else:
+        atr = atr * atr_one_minus + tr * atr_alpha
+
+    rsi = math.nan
+    if not math.isnan(prev_close):
+        delta = close - prev_close
+        gain = max(delta, 0.0)
+        loss = max(-delta, 0.0)
+        if math.isnan(avg_gain):
+            seed_gain += gain
+            seed_loss += loss
+            seed_count += 1
+            seeded = seed_count == rsi_period
+            if seeded:
+                avg_gain = seed_gain * rsi_alpha
+                avg_loss = seed_loss * rsi_alpha
+        else:
+            avg_gain = avg_gain * rsi_one_minus + gain * rsi_alpha
+            avg_loss = avg_loss * rsi_one_minus + loss * rsi_alpha
+            seeded = True
+        # Only read the averages once a branch above has proved them initialized, so a zero
+        # avg_loss always means "no losses", never "not seeded yet".
+        if seeded:
+            if avg_loss == 0:
+                rsi = 100.0
+            else:
+                rsi = 100 - (100 / (1 + avg_gain / avg_loss))
+
+    signal = SIGNAL_HOLD
+    stop = math.nan
+    if not (math.isnan(prev_fast) or math.isnan(prev_slow) or math.isnan(rsi)):
+        stop_distance = atr_multiplier * atr
+        if prev_fast <= prev_slow and fast > slow and rsi < 70:
+            signal = SIGNAL_BUY
+            stop = close - stop_distance
+        elif prev_fast >= prev_slow and fast < slow and rsi > 30:
+            signal = SIGNAL_SELL
+            stop = close + stop_distance
+    return fast, slow, atr, avg_gain, avg_loss, seed_gain, seed_loss, seed_count, signal, stop
+
+
+@njit(cache=True)
+def bulk_tick_kernel(
+    rows: np.ndarray,
+    close: np.ndarray,
+    high: np.ndarray,
+    low: np.ndarray,
+    state: np.ndarray,
+    k_fast: float,
+    k_slow: float,
+    rsi_period: int,
+    rsi_alpha: float,
+    rsi_one_minus: float,
+    atr_alpha: float,
+    atr_one_minus: float,
+    atr_multiplier: float,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Apply tick j to state row rows[j], in order, updating the state array in place.
+
+    Returns per-tick signal codes (int8) and stop-loss levels (NaN where HOLD).
+    """
+    n = rows.shape[0]
+    signals = np.zeros(n, dtype=np.int8)
+    stops = np.full(n, np.nan)
+    for j in range(n):
+        r = rows[j]
+        fast, slow, atr, avg_gain, avg_loss, seed_gain, seed_loss, seed_count, code, stop = tick_kernel(
+            close[j],
+            high[j],
+            low[j],
+            state[r, 3],
+            state[r, 0],
+            state[r, 1],
+            state[r, 2],
+            state[r, 4],
+            state[r, 5],
+            state[r, 6],
+            state[r, 7],
+            state[r, 8],
+            k_fast,
+            k_slow,
+            rsi_period,
+            rsi_alpha,
+            rsi_one_minus,
+            atr_alpha,
+            atr_one_minus,
+            atr_multiplier,
+        )
+        state[r, 0] = fast
+        state[r, 1] = slow
+        state[r, 2] = atr
+        state[r, 3] = close[j]
+        state[r, 4] = avg_gain
+        state[r, 5] = avg_loss
+        state[r, 6] = seed_gain
+        state[r, 7] = seed_loss
+        state[r, 8] = seed_count
+        signals[j] = code
+        stops[j] = stop
+    return signals, stops
+
+
+@njit(cache=True)
+def warmup_kernel(
+    close: np.ndarray,
+    high: np.ndarray,
+    low: np.ndarray,
+    state: np.ndarray,
+    k_fast: float,
+    k_slow: float,
+    rsi_period: int,
+    rsi_alpha: float,
+    rsi_one_minus: float,
+    atr_alpha: float,
+    atr_one_minus: float,
+) -> None:
+    """Feed historical bars through tick_kernel, advancing one strategy state row in place.
+
+    state uses the TrendFollowingStrategy column order: fast, slow, atr, prev_close, avg_gain,
+    avg_loss, seed_gain, seed_loss, seed_count.
+    """
+    fast = state[0]
+    slow = state[1]
+    atr = state[2]
+    prev_close = state[3]
+    avg_gain = state[4]
+    avg_loss = state[5]
+    seed_gain = state[6]
+    seed_loss = state[7]
+    seed_count = state[8]
+    for i in range(close.shape[0]):
+        fast, slow, atr, avg_gain, avg_loss, seed_gain, seed_loss, seed_count, _, _ = tick_kernel(
+            close[i],
+            high[i],
+            low[i],
+            prev_close,
+            fast,
+            slow,
+            atr,
+            avg_gain,
+            avg_loss,
+            seed_gain,
+            seed_loss,
+            seed_count,
+            k_fast,
+            k_slow,
+            rsi_period,
+            rsi_alpha,
+            rsi_one_minus,
+            atr_alpha,
+            atr_one_minus,
+            0.0,
+        )
+        prev_close = close[i]
+    state[0] = fast
+    state[1] = slow
+    state[2] = atr
+    state[3] = prev_close
+    state[4] = avg_gain
+    state[5] = avg_loss
+    state[6] = seed_gain
+    state[7] = seed_loss
+    state[8] = seed_count
+
+
+@njit(cache=True)
+def indicator_series(
+    close: np.ndarray,
+    high: np.ndarray,
+    low: np.ndarray,
+    fast_period: int,
+    slow_period: int,
+    rsi_period: int,
+    atr_period: int,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Fast/slow EMA, Wilder ATR and Wilder RSI (NaN while seeding) in one fused pass over the bars."""
+    n = close.shape[0]
+    fast = np.empty(n)
+    slow = np.empty(n)
+    atr = np.empty(n)
+    rsi = np.full(n, np.nan)
+    if n == 0:
+        return fast, slow, atr, rsi
+
+    k_fast, k_slow, rsi_alpha, rsi_one_minus, atr_alpha, atr_one_minus = smoothing_constants(
+        fast_period, slow_period, rsi_period, atr_period
+    )
+    # The RSI seed is the mean gain/loss over the first rsi_period deltas, known before the loop.
+    avg_gain = 0.0
+    avg_loss = 0.0
+    if n > rsi_period:
+        seed = np.diff(close[: rsi_period + 1])
+        avg_gain = np.clip(seed, 0.0, np.inf).sum() * rsi_alpha
+        avg_loss = np.clip(-seed, 0.0, np.inf).sum() * rsi_alpha
+    fast[0] = close[0]
+    slow[0] = close[0]
+    atr[0] = high[0] - low[0]
+    for i in range(1, n):
+        price = close[i]
+        prev_close = close[i - 1]
+        fast[i] = fast[i - 1] + k_fast * (price - fast[i - 1])
+        slow[i] = slow[i - 1] + k_slow * (price - slow[i - 1])
+
+        tr = high[i] - low[i]
+        abs_hc = abs(high[i] - prev_close)
+        abs_lc = abs(low[i] - prev_close)
+        tr = tr if tr > abs_hc else abs_hc
+        tr = tr if tr > abs_lc else abs_lc
+        atr[i] = atr[i - 1] * atr_one_minus + tr * atr_alpha
+
+        if i < rsi_period:
+            continue
+        if i > rsi_period:
+            delta = price - prev_close
+            avg_gain = avg_gain * rsi_one_minus + max(delta, 0.0) * rsi_alpha
+            avg_loss = avg_loss * rsi_one_minus + max(-delta, 0.0) * rsi_alpha
+        if avg_loss == 0:
+            rsi[i] = 100.0
+        else:
+            rsi[i] = 100 - (100 / (1 + avg_gain / avg_loss))
+    return fast, slow, atr, rsi
+
+
+def process_batch(
+    closes,
+    highs,
+    lows,
+    fast_period: int = 9,
+    slow_period: int = 21,
+    rsi_period: int = 14,
+    atr_period: int = 14,
+    atr_multiplier: float = 2.0,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Return per-bar signal codes (int8) and stop-loss levels (NaN where HOLD)."""
+    close, high, low = bar_arrays(closes, highs, lows)
+    n = close.shape[0]
+
+    signals = np.full(n, SIGNAL_HOLD, dtype=np.int8)
+    stops = np.full(n, np.nan)
+    if n < 2:
+        return signals, stops
+
+    fast, slow, atr, rsi = indicator_series(close, high, low, fast_period, slow_period, rsi_period, atr_period)
+
+    # Bar i compares against bar i-1; NaN RSI (still seeding) fails both filters, i.e. HOLD.
+    bull = (fast[:-1] <= slow[:-1]) & (fast[1:] > slow[1:]) & (rsi[1:] < 70)
+    bear = (fast[:-1] >= slow[:-1]) & (fast[1:] < slow[1:]) & (rsi[1:] > 30)
+
+    stop_distance = atr_multiplier * atr[1:]
+    signals[1:][bull] = SIGNAL_BUY
+    signals[1:][bear] = SIGNAL_SELL
+    stops[1:] = np.where(bull, close[1:] - stop_distance, np.where(bear, close[1:] + stop_distance, np.nan))
+    return signals, stops
@@ -2,37 +2,85 @@ from __future__ import annotations
 
 import asyncio
 import logging
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
+import queue
 import sys
 import time
 
+LOG_MAX_BYTES = 50_000_000
+LOG_BACKUP_COUNT = 5
+
+_log_listener: QueueListener | None = None
+
+
+class CachedTimeFormatter(logging.Formatter):
+    """Formatter that runs localtime/strftime at most once per wall-clock second."""
+
+    def __init__(self, fmt: str | None = None, datefmt: str | None = None) -> None:
+        super().__init__(fmt, datefmt)
+        self._cached_second = -1
+        self._cached_time = ""
+
+    def formatTime(self, record: logging.LogRecord, datefmt: str | None = None) -> str:
+        second = int(record.created)
+        if second != self._cached_second:
+            self._cached_time = time.strftime(datefmt or self.datefmt or "%Y-%m-%d %H:%M:%S", time.localtime(second))
+            self._cached_second = second
+        return self._cached_time
+
 
 def setup_logging(level: str = "INFO", log_dir: Path | None = None) -> None:
-    """Configure console and rotating file logging with timestamps."""
+    """Configure console and rotating file logging with timestamps.
+
+    Records are queued by the caller and written by a background listener thread, so logging never
+    blocks the event loop on console or disk I/O. Call stop_logging() on exit to flush the queue.
+    """
+    global _log_listener
     resolved_dir = log_dir or Path("logs")
     resolved_dir.mkdir(parents=True, exist_ok=True)
     log_path = resolved_dir / "trader.log"
 
-    formatter = logging.Formatter(
+    formatter = CachedTimeFormatter(
         "%(asctime)s | %(levelname)s | %(name)s | %(message)s", datefmt="%Y-%m-%d %H:%M:%S"
     )
 
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setFormatter(formatter)
 
-    file_handler = logging.FileHandler(log_path, encoding="utf-8")
+    file_handler = RotatingFileHandler(
+        log_path, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT, encoding="utf-8"
+    )
     file_handler.setFormatter(formatter)
 
-    logging.basicConfig(level=level, handlers=[console_handler, file_handler], force=True)
+    stop_logging()
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    _log_listener = QueueListener(log_queue, console_handler, file_handler, respect_handler_level=True)
+    _log_listener.start()
+
+    # The listener's handlers apply the real format; keep basicConfig from adding BASIC_FORMAT here too.
+    queue_handler = QueueHandler(log_queue)
+    queue_handler.setFormatter(logging.Formatter("%(message)s"))
+    logging.basicConfig(level=level, handlers=[queue_handler], force=True)
     logging.getLogger("asyncio").setLevel(logging.WARNING)
 
 
+def stop_logging() -> None:
+    """Drain queued log records to their handlers and stop the listener thread."""
+    global _log_listener
+    if _log_listener is not None:
+        _log_listener.stop()
+        _log_listener = None
+
+
 def compute_backoff(attempt: int, base: float, max_delay: float) -> float:
-    return min(max_delay, base * (2**attempt))
+    # Shift instead of int.__pow__; the cap only guards absurd attempt counts, long past the clamp.
+    return min(max_delay, base * float(1 << min(attempt, 62)))
 
 
 async def resilient_sleep(delay: float, cancel_event: asyncio.Event) -> None:
-    """Sleep while allowing cooperative cancellation."""
-    end_time = time.monotonic() + delay
-    while time.monotonic() < end_time and not cancel_event.is_set():
-        await asyncio.sleep(min(0.5, end_time - time.monotonic()))
+    """Sleep for delay seconds, returning early as soon as cancel_event is set."""
+    try:
+        await asyncio.wait_for(cancel_event.wait(), timeout=delay)
+    except asyncio.TimeoutError:
+        pass